@@ -57,6 +57,7 @@ class RepositoryFactory(object):
     def execution_store_repo(
         dataset_id: Optional[ObjectId] = None,
         collection_name: Optional[str] = None,
+        fast_writes: bool = False,
     ) -> ExecutionStoreRepo:
         collection = _get_db()[
             collection_name or MongoExecutionStoreRepo.COLLECTION_NAME
@@ -64,4 +65,5 @@ class RepositoryFactory(object):
         return MongoExecutionStoreRepo(
             collection=collection,
             dataset_id=dataset_id,
+            fast_writes=fast_writes,
         )
@@ -6,15 +6,32 @@ Execution store repository.
 |
 """
 
-from datetime import datetime
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
 
 from bson import ObjectId
+from pymongo import DeleteOne, UpdateOne
 from pymongo.collection import Collection
-from typing import Any, Dict
+from pymongo.errors import OperationFailure
+from pymongo.write_concern import WriteConcern
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from fiftyone.operators.store.models import StoreDocument, KeyDocument
 
 
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    """Returns the current UTC time.
+
+    Unlike the deprecated ``datetime.utcnow()``, the returned datetime is
+    timezone-aware.
+    """
+    return datetime.now(timezone.utc)
+
+
 class ExecutionStoreRepo(object):
     """Base class for execution store repositories.
 
@@ -27,14 +44,47 @@ class ExecutionStoreRepo(object):
 
     To operate on all stores across all contexts, use the ``XXX_global()``
     methods that this class provides.
+
+    When ``fast_writes`` is True, writes are issued with ``w=1, j=False``
+    write concern, trading majority-ack durability for lower write latency.
+    Key writes are idempotent, so callers that can tolerate re-issuing a
+    write after a failover may opt in on high-volume paths.
     """
 
     COLLECTION_NAME = "execution_store"
 
-    def __init__(self, collection: Collection, dataset_id: ObjectId = None):
+    _BATCH_SIZE = 1000
+    _CLEANUP_THRESHOLD = 10000
+    _CLEANUP_CHUNK_SIZE = 5000
+
+    def __init__(
+        self,
+        collection: Collection,
+        dataset_id: ObjectId = None,
+        fast_writes: bool = False,
+    ):
+        if fast_writes:
+            collection = collection.with_options(
+                write_concern=WriteConcern(w=1, j=False)
+            )
+
         self._collection = collection
         self._dataset_id = dataset_id
 
+        # Precomputed filter fragments shared by every query in this context
+        self._base_filter = {"dataset_id": dataset_id}
+        self._store_filter = {"key": "__store__", **self._base_filter}
+
+    @staticmethod
+    def _add_expiry_filter(filt: Dict[str, Any]) -> Dict[str, Any]:
+        # MongoDB's TTL monitor only runs periodically, so expired documents
+        # can linger between sweeps; this prunes them server-side
+        filt["$or"] = [
+            {"expires_at": None},
+            {"expires_at": {"$gt": _utcnow()}},
+        ]
+        return filt
+
     def create_store(
         self, store_name, metadata: Dict[str, Any] = None
     ) -> StoreDocument:
@@ -50,11 +100,7 @@ class ExecutionStoreRepo(object):
     def get_store(self, store_name) -> StoreDocument:
         """Gets a store associated with the current context."""
         raw_store_doc = self._collection.find_one(
-            dict(
-                store_name=store_name,
-                key="__store__",
-                dataset_id=self._dataset_id,
-            )
+            {**self._store_filter, "store_name": store_name}
         )
         if not raw_store_doc and self.has_store(store_name):
             return StoreDocument(
@@ -68,26 +114,66 @@ class ExecutionStoreRepo(object):
         """Checks whether a store with the given name exists in the current
         context.
         """
-        result = self._collection.find_one(
-            dict(
-                store_name=store_name,
-                dataset_id=self._dataset_id,
+        return (
+            self._collection.count_documents(
+                {**self._base_filter, "store_name": store_name},
+                limit=1,
             )
+            > 0
         )
-        return bool(result)
 
     def list_stores(self) -> list[str]:
         """Lists the stores associated with the current context."""
+        return list(self.iter_stores())
+
+    def iter_stores(self) -> Iterator[str]:
+        """Returns an iterator over the stores associated with the current
+        context.
+        """
         pipeline = [
-            {"$match": {"dataset_id": self._dataset_id}},
+            {"$match": self._base_filter},
             {"$group": {"_id": "$store_name"}},
         ]
-        return [d["_id"] for d in self._collection.aggregate(pipeline)]
+        for d in self._collection.aggregate(
+            pipeline, batchSize=self._BATCH_SIZE
+        ):
+            yield d["_id"]
+
+    def list_stores_with_counts(self) -> Dict[str, int]:
+        """Lists the stores associated with the current context along with
+        their key counts, in a single query.
+
+        Returns:
+            a dict mapping store names to their number of keys
+        """
+        pipeline = [
+            {"$match": self._base_filter},
+            {
+                "$group": {
+                    "_id": "$store_name",
+                    "count": {
+                        "$sum": {
+                            "$cond": [
+                                {"$eq": ["$key", "__store__"]},
+                                0,
+                                1,
+                            ]
+                        }
+                    },
+                }
+            },
+        ]
+        return {
+            d["_id"]: d["count"]
+            for d in self._collection.aggregate(
+                pipeline, batchSize=self._BATCH_SIZE
+            )
+        }
 
     def count_stores(self) -> int:
         """Counts the stores associated with the current context."""
         pipeline = [
-            {"$match": {"dataset_id": self._dataset_id}},
+            {"$match": self._base_filter},
             {"$group": {"_id": "$store_name"}},
             {"$count": "total_stores"},
         ]
@@ -98,132 +184,269 @@ class ExecutionStoreRepo(object):
     def delete_store(self, store_name) -> int:
         """Deletes the specified store."""
         result = self._collection.delete_many(
-            dict(store_name=store_name, dataset_id=self._dataset_id)
+            {**self._base_filter, "store_name": store_name}
         )
         return result.deleted_count
 
     def set_key(self, store_name, key, value, ttl=None) -> KeyDocument:
         """Sets or updates a key in the specified store."""
-        now = datetime.utcnow()
-        expiration = KeyDocument.get_expiration(ttl)
-
-        key_doc = KeyDocument(
-            store_name=store_name,
-            key=key,
-            value=value,
-            updated_at=now,
-            expires_at=expiration,
-            dataset_id=self._dataset_id,
-        )
-
-        on_insert_fields = {
-            "store_name": store_name,
-            "key": key,
-            "created_at": now,
-            "expires_at": expiration if ttl else None,
-            "dataset_id": self._dataset_id,
-        }
-
-        # Prepare the update operations
-        update_fields = {
-            "$set": {
-                k: v
-                for k, v in key_doc.to_mongo_dict().items()
-                if k
-                not in {
-                    "_id",
-                    "created_at",
-                    "expires_at",
-                    "store_name",
-                    "key",
-                    "dataset_id",
-                }
-            },
-            "$setOnInsert": on_insert_fields,
-        }
+        return self.set_keys(store_name, [(key, value, ttl)])[0]
+
+    def set_keys(
+        self,
+        store_name,
+        items: List[Tuple[str, Any, Optional[int]]],
+    ) -> List[KeyDocument]:
+        """Sets or updates multiple keys in the specified store via a single
+        bulk write.
+
+        Args:
+            store_name: the name of the store
+            items: a list of ``(key, value, ttl)`` tuples
+
+        Returns:
+            a list of :class:`fiftyone.operators.store.models.KeyDocument`
+        """
+        if not items:
+            return []
+
+        # Capture `now` once so that all entries in the batch share a
+        # consistent timestamp and expirations can be computed inline
+        now = _utcnow()
+
+        key_docs = []
+        ops = []
+        for key, value, ttl in items:
+            expiration = now + timedelta(seconds=ttl) if ttl else None
+
+            on_insert_fields = {
+                "store_name": store_name,
+                "key": key,
+                "created_at": now,
+                "expires_at": expiration,
+                "dataset_id": self._dataset_id,
+            }
+
+            # Prepare the update operations. The `updated_at` timestamp is
+            # written server-side via `$currentDate` to avoid client/server
+            # clock skew; `created_at` must remain client-side because
+            # `$currentDate` cannot be scoped to inserts only
+            update_fields = {
+                "$set": {"value": value},
+                "$setOnInsert": on_insert_fields,
+                "$currentDate": {"updated_at": True},
+            }
+
+            ops.append(
+                UpdateOne(
+                    {
+                        **self._base_filter,
+                        "store_name": store_name,
+                        "key": key,
+                    },
+                    update_fields,
+                    upsert=True,
+                )
+            )
+            key_docs.append(
+                KeyDocument(
+                    store_name=store_name,
+                    key=key,
+                    value=value,
+                    updated_at=now,
+                    expires_at=expiration,
+                    dataset_id=self._dataset_id,
+                )
+            )
 
-        # Perform the upsert operation
-        result = self._collection.update_one(
-            dict(store_name=store_name, key=key, dataset_id=self._dataset_id),
-            update_fields,
-            upsert=True,
-        )
+        # Perform the upsert operations in a single round-trip
+        result = self._collection.bulk_write(ops, ordered=False)
 
-        if result.upserted_id:
-            key_doc.created_at = now
-        else:
-            key_doc.updated_at = now
+        for idx, key_doc in enumerate(key_docs):
+            if idx in result.upserted_ids:
+                key_doc.created_at = now
+            else:
+                key_doc.updated_at = now
 
-        return key_doc
+        return key_docs
 
     def has_key(self, store_name, key) -> bool:
         """Determines whether a key exists in the specified store."""
         result = self._collection.find_one(
-            dict(store_name=store_name, key=key, dataset_id=self._dataset_id)
+            self._add_expiry_filter(
+                {**self._base_filter, "store_name": store_name, "key": key}
+            )
         )
         return bool(result)
 
     def get_key(self, store_name, key) -> KeyDocument:
         """Gets a key from the specified store."""
         raw_key_doc = self._collection.find_one(
-            dict(store_name=store_name, key=key, dataset_id=self._dataset_id)
+            self._add_expiry_filter(
+                {**self._base_filter, "store_name": store_name, "key": key}
+            )
         )
         key_doc = KeyDocument(**raw_key_doc) if raw_key_doc else None
         return key_doc
 
     def update_ttl(self, store_name, key, ttl) -> bool:
         """Updates the TTL for a key."""
-        expiration = KeyDocument.get_expiration(ttl)
-        result = self._collection.update_one(
-            dict(store_name=store_name, key=key, dataset_id=self._dataset_id),
-            {"$set": {"expires_at": expiration}},
-        )
-        return result.modified_count > 0
+        return self.update_ttls(store_name, [(key, ttl)]) > 0
+
+    def update_ttls(
+        self,
+        store_name,
+        items: List[Tuple[str, Optional[int]]],
+    ) -> int:
+        """Updates the TTLs for multiple keys in the specified store via a
+        single bulk write.
+
+        Args:
+            store_name: the name of the store
+            items: a list of ``(key, ttl)`` tuples
+
+        Returns:
+            the number of keys updated
+        """
+        if not items:
+            return 0
+
+        ops = [
+            UpdateOne(
+                {**self._base_filter, "store_name": store_name, "key": key},
+                {"$set": {"expires_at": KeyDocument.get_expiration(ttl)}},
+            )
+            for key, ttl in items
+        ]
+        result = self._collection.bulk_write(ops, ordered=False)
+        return result.modified_count
 
     def delete_key(self, store_name, key) -> bool:
         """Deletes the document that matches the store name and key, if one
         exists.
         """
-        result = self._collection.delete_one(
-            dict(store_name=store_name, key=key, dataset_id=self._dataset_id)
-        )
-        return result.deleted_count > 0
+        return self.delete_keys(store_name, [key]) > 0
+
+    def delete_keys(self, store_name, keys: List[str]) -> int:
+        """Deletes multiple keys from the specified store via a single bulk
+        write.
+
+        Args:
+            store_name: the name of the store
+            keys: a list of keys to delete
+
+        Returns:
+            the number of keys deleted
+        """
+        if not keys:
+            return 0
+
+        ops = [
+            DeleteOne(
+                {**self._base_filter, "store_name": store_name, "key": key}
+            )
+            for key in keys
+        ]
+        result = self._collection.bulk_write(ops, ordered=False)
+        return result.deleted_count
 
     def list_keys(self, store_name) -> list[str]:
         """Lists all keys in the specified store."""
-        result = self._collection.find(
-            dict(
-                store_name=store_name,
-                key={"$ne": "__store__"},
-                dataset_id=self._dataset_id,
-            ),
-            {"key": 1},
-        )
-        return [d["key"] for d in result]
+        return list(self.iter_keys(store_name))
+
+    def iter_keys(
+        self, store_name, after_key=None, page_size=None
+    ) -> Iterator[str]:
+        """Returns an iterator over the keys in the specified store, in
+        ascending order.
+
+        Keys are retrieved in pages so that arbitrarily large stores can be
+        iterated with bounded memory on both the client and the server.
+
+        Args:
+            store_name: the name of the store
+            after_key (None): an optional key after which to start iterating
+            page_size (None): an optional number of keys to retrieve per
+                query. The default is 1000
+        """
+        if page_size is None:
+            page_size = self._BATCH_SIZE
+
+        while True:
+            filt = self._add_expiry_filter(
+                {
+                    **self._base_filter,
+                    "store_name": store_name,
+                    "key": {"$ne": "__store__"},
+                }
+            )
+            if after_key is not None:
+                filt["key"]["$gt"] = after_key
+
+            docs = list(
+                self._collection.find(filt, {"key": 1, "_id": 0})
+                .sort("key", 1)
+                .limit(page_size)
+            )
+            for d in docs:
+                yield d["key"]
+
+            if len(docs) < page_size:
+                return
+
+            after_key = docs[-1]["key"]
 
     def count_keys(self, store_name) -> int:
         """Counts the keys in the specified store."""
         return self._collection.count_documents(
-            dict(
-                store_name=store_name,
-                key={"$ne": "__store__"},
-                dataset_id=self._dataset_id,
+            self._add_expiry_filter(
+                {
+                    **self._base_filter,
+                    "store_name": store_name,
+                    "key": {"$ne": "__store__"},
+                }
             )
         )
 
     def cleanup(self) -> int:
         """Deletes all stores and keys associated with the current context."""
-        result = self._collection.delete_many(
-            dict(dataset_id=self._dataset_id)
+        filt = dict(self._base_filter)
+
+        num_docs = self._collection.count_documents(
+            filt, limit=self._CLEANUP_THRESHOLD
         )
-        return result.deleted_count
+        if num_docs < self._CLEANUP_THRESHOLD:
+            result = self._collection.delete_many(filt)
+            return result.deleted_count
+
+        # Large context; delete in chunks by ID so that each delete commits
+        # quickly rather than holding a single long-running write
+        num_deleted = 0
+        while True:
+            ids = [
+                d["_id"]
+                for d in self._collection.find(filt, {"_id": 1})
+                .batch_size(self._CLEANUP_CHUNK_SIZE)
+                .limit(self._CLEANUP_CHUNK_SIZE)
+            ]
+            if not ids:
+                break
+
+            result = self._collection.delete_many({"_id": {"$in": ids}})
+            num_deleted += result.deleted_count
+
+        return num_deleted
 
     def has_store_global(self, store_name):
         """Determines whether a store with the given name exists across all
         datasets and the global context.
         """
-        result = self._collection.find_one(dict(store_name=store_name), {})
-        return bool(result)
+        return (
+            self._collection.count_documents(
+                dict(store_name=store_name), limit=1
+            )
+            > 0
+        )
 
     def list_stores_global(self) -> list[StoreDocument]:
         """Lists stores across all datasets and the global context."""
@@ -245,11 +468,25 @@ class ExecutionStoreRepo(object):
             },
         ]
 
-        result = self._collection.aggregate(pipeline)
+        result = self._collection.aggregate(
+            pipeline, batchSize=self._BATCH_SIZE
+        )
         return [StoreDocument(**d) for d in result]
 
-    def count_stores_global(self) -> int:
-        """Counts stores across all datasets and the global context."""
+    def count_stores_global(self, exact: bool = True) -> int:
+        """Counts stores across all datasets and the global context.
+
+        Args:
+            exact (True): whether to compute the exact count, which requires
+                scanning all documents. When False, returns a fast index-only
+                count of explicitly created stores, which omits stores that
+                contain only keys
+        """
+        if not exact:
+            return self._collection.count_documents(
+                {"key": "__store__"}, hint="covered_store_list"
+            )
+
         pipeline = [
             {
                 "$group": {
@@ -276,27 +513,107 @@ class ExecutionStoreRepo(object):
 class MongoExecutionStoreRepo(ExecutionStoreRepo):
     """MongoDB implementation of execution store repository."""
 
-    def __init__(self, collection: Collection, dataset_id: ObjectId = None):
-        super().__init__(collection, dataset_id)
+    # Collections whose indexes have already been ensured by this process,
+    # keyed by full collection name
+    _indexes_ensured = set()
+    _indexes_lock = threading.Lock()
+
+    def __init__(
+        self,
+        collection: Collection,
+        dataset_id: ObjectId = None,
+        fast_writes: bool = False,
+    ):
+        super().__init__(collection, dataset_id, fast_writes=fast_writes)
         self._create_indexes()
 
     def _create_indexes(self):
-        indices = [idx["name"] for idx in self._collection.list_indexes()]
+        full_name = self._collection.full_name
+        if full_name in self._indexes_ensured:
+            return
+
+        with self._indexes_lock:
+            if full_name in self._indexes_ensured:
+                return
+
+            self._do_create_indexes()
+            self._indexes_ensured.add(full_name)
+
+    def _do_create_indexes(self):
+        indices = self._collection.index_information()
         expires_at_name = "expires_at"
-        store_name_name = "store_name"
-        key_name = "key"
         full_key_name = "unique_store_index"
-        dataset_id_name = "dataset_id"
         if expires_at_name not in indices:
             self._collection.create_index(
                 expires_at_name, name=expires_at_name, expireAfterSeconds=0
             )
+
+        # Ordered per the equality-sort-range rule: every query in this
+        # module filters on `dataset_id`, most also on `key`, and only some
+        # on `store_name`, so this prefix ordering serves all of them without
+        # sibling single-field indexes
+        full_key_spec = [("dataset_id", 1), ("key", 1), ("store_name", 1)]
+        if full_key_name in indices:
+            # Collections created before the reorder have this name bound to
+            # the old `(store_name, key, dataset_id)` ordering; recreate it
+            existing_spec = [tuple(f) for f in indices[full_key_name]["key"]]
+            if existing_spec != full_key_spec:
+                try:
+                    self._collection.drop_index(full_key_name)
+                except OperationFailure:
+                    # Another process may have already dropped the stale
+                    # index
+                    pass
+
+                indices.pop(full_key_name)
+
         if full_key_name not in indices:
+            try:
+                self._collection.create_index(
+                    full_key_spec, name=full_key_name, unique=True
+                )
+                indices[full_key_name] = {"key": full_key_spec}
+            except OperationFailure as e:
+                # Never let index migration block repo construction; eg
+                # another process may be recreating the index concurrently,
+                # or pre-existing duplicates may block the unique build
+                logger.warning(
+                    "Failed to create index '%s': %s", full_key_name, e
+                )
+        covered_store_list_name = "covered_store_list"
+        covered_store_list_spec = [
+            ("key", 1),
+            ("dataset_id", 1),
+            ("store_name", 1),
+        ]
+        if covered_store_list_name not in indices:
+            # Covers store listing/counting queries, which only touch these
+            # three fields, so the server never has to fetch full documents
             self._collection.create_index(
-                [(store_name_name, 1), (key_name, 1), (dataset_id_name, 1)],
-                name=full_key_name,
-                unique=True,
+                covered_store_list_spec, name=covered_store_list_name
             )
-        for name in [store_name_name, key_name, dataset_id_name]:
-            if name not in indices:
-                self._collection.create_index(name, name=name)
+            indices[covered_store_list_name] = {"key": covered_store_list_spec}
+
+        # `has_store_global()` and `delete_store_global()` filter on
+        # `store_name` alone, which no compound index has as a prefix
+        store_name_name = "store_name"
+        if store_name_name not in indices:
+            self._collection.create_index(
+                store_name_name, name=store_name_name
+            )
+
+        # The `key` and `dataset_id` single-field indexes are subsumed by the
+        # compound indexes above but still tax every write; drop them, but
+        # only once a compound index with the field as a prefix is in place
+        compound_prefixes = {
+            info["key"][0][0]
+            for info in indices.values()
+            if len(info["key"]) > 1
+        }
+        for name in ("key", "dataset_id"):
+            if name in indices and name in compound_prefixes:
+                try:
+                    self._collection.drop_index(name)
+                except OperationFailure:
+                    # Another process may have already dropped this index
+                    pass
@@ -84,6 +84,15 @@ class ExecutionStoreService(object):
         """
         return self._repo.list_stores()
 
+    def list_stores_with_counts(self) -> dict[str, int]:
+        """Lists all stores for the current context along with their key
+        counts.
+
+        Returns:
+            a dict mapping store names to their number of keys
+        """
+        return self._repo.list_stores_with_counts()
+
     def count_stores(self) -> int:
         """Counts the stores for the current context.
 
@@ -225,13 +234,18 @@ class ExecutionStoreService(object):
         """
         return self._repo.list_stores_global()
 
-    def count_stores_global(self) -> int:
+    def count_stores_global(self, exact: bool = True) -> int:
         """Counts the stores across all datasets and the global context.
 
+        Args:
+            exact (True): whether to compute the exact count. When False, a
+                faster index-only count is returned that omits stores that
+                contain only keys
+
         Returns:
             the number of stores
         """
-        return self._repo.count_stores_global()
+        return self._repo.count_stores_global(exact=exact)
 
     def delete_store_global(self, store_name) -> int:
         """Deletes the specified store across all datasets and the global
@@ -12,6 +12,7 @@ import unittest
 from unittest.mock import patch, MagicMock, ANY, Mock
 
 from bson import ObjectId
+from pymongo import DeleteOne, UpdateOne
 
 from fiftyone.operators.store import ExecutionStoreService
 from fiftyone.operators.store.models import KeyDocument
@@ -21,12 +22,27 @@ from fiftyone.operators.store import ExecutionStore
 
 EPSILON = 0.1
 
+EXPIRY_FILTER = {"$or": [{"expires_at": None}, {"expires_at": {"$gt": ANY}}]}
+
 
 class IsDateTime:
     def __eq__(self, other):
         return isinstance(other, datetime)
 
 
+class IsApproxDateTime:
+    """Matches datetimes within EPSILON seconds of the expected value."""
+
+    def __init__(self, expected):
+        self.expected = expected
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, datetime)
+            and abs((other - self.expected).total_seconds()) < EPSILON
+        )
+
+
 def assert_delta_seconds_approx(time_delta, seconds, epsilon=EPSILON):
     assert abs(time_delta.total_seconds() - seconds) < epsilon
 
@@ -59,29 +75,52 @@ class ExecutionStoreServiceIntegrationTests(unittest.TestCase):
             {"name": "Widget One", "value": 100},
             ttl=60000,
         )
-        self.mock_collection.update_one.assert_called_once()
-        self.mock_collection.update_one.assert_called_with(
-            {
-                "store_name": "widgets",
-                "key": "widget_1",
-                "dataset_id": None,
-            },
-            {
-                "$set": {
-                    "value": {"name": "Widget One", "value": 100},
-                    "updated_at": IsDateTime(),
-                },
-                "$setOnInsert": {
-                    "store_name": "widgets",
-                    "key": "widget_1",
-                    "created_at": IsDateTime(),
-                    "expires_at": IsDateTime(),
-                    "dataset_id": None,
-                },
-            },
-            upsert=True,
+        self.mock_collection.bulk_write.assert_called_once()
+        self.mock_collection.bulk_write.assert_called_with(
+            [
+                UpdateOne(
+                    {
+                        "store_name": "widgets",
+                        "key": "widget_1",
+                        "dataset_id": None,
+                    },
+                    {
+                        "$set": {
+                            "value": {"name": "Widget One", "value": 100},
+                        },
+                        "$setOnInsert": {
+                            "store_name": "widgets",
+                            "key": "widget_1",
+                            "created_at": IsDateTime(),
+                            "expires_at": IsDateTime(),
+                            "dataset_id": None,
+                        },
+                        "$currentDate": {"updated_at": True},
+                    },
+                    upsert=True,
+                )
+            ],
+            ordered=False,
         )
 
+    def test_set_keys(self):
+        self.store_repo.set_keys(
+            "widgets",
+            [
+                ("widget_1", {"name": "Widget One", "value": 100}, None),
+                ("widget_2", {"name": "Widget Two", "value": 200}, 60000),
+            ],
+        )
+        self.mock_collection.bulk_write.assert_called_once()
+        ops = self.mock_collection.bulk_write.call_args[0][0]
+        assert len(ops) == 2
+        assert all(isinstance(op, UpdateOne) for op in ops)
+
+    def test_set_keys_empty(self):
+        key_docs = self.store_repo.set_keys("widgets", [])
+        assert key_docs == []
+        self.mock_collection.bulk_write.assert_not_called()
+
     def test_get_key(self):
         self.mock_collection.find_one.return_value = {
             "store_name": "widgets",
@@ -99,6 +138,7 @@ class ExecutionStoreServiceIntegrationTests(unittest.TestCase):
                 "store_name": "widgets",
                 "key": "widget_1",
                 "dataset_id": None,
+                **EXPIRY_FILTER,
             }
         )
 
@@ -117,29 +157,78 @@ class ExecutionStoreServiceIntegrationTests(unittest.TestCase):
             }
         )
 
+    def test_list_stores_with_counts(self):
+        self.mock_collection.aggregate.return_value = [
+            {"_id": "widgets", "count": 2},
+            {"_id": "gadgets", "count": 0},
+        ]
+        counts = self.store_repo.list_stores_with_counts()
+        assert counts == {"widgets": 2, "gadgets": 0}
+        self.mock_collection.aggregate.assert_called_once()
+
     def test_delete_key(self):
-        self.mock_collection.delete_one.return_value = Mock(deleted_count=1)
+        self.mock_collection.bulk_write.return_value = Mock(deleted_count=1)
         self.store_repo.delete_key("widgets", "widget_1")
-        self.mock_collection.delete_one.assert_called_once()
-        self.mock_collection.delete_one.assert_called_with(
-            {
-                "store_name": "widgets",
-                "key": "widget_1",
-                "dataset_id": None,
-            }
+        self.mock_collection.bulk_write.assert_called_once()
+        self.mock_collection.bulk_write.assert_called_with(
+            [
+                DeleteOne(
+                    {
+                        "store_name": "widgets",
+                        "key": "widget_1",
+                        "dataset_id": None,
+                    }
+                )
+            ],
+            ordered=False,
         )
 
+    def test_delete_keys(self):
+        self.mock_collection.bulk_write.return_value = Mock(deleted_count=2)
+        num_deleted = self.store_repo.delete_keys(
+            "widgets", ["widget_1", "widget_2"]
+        )
+        assert num_deleted == 2
+        self.mock_collection.bulk_write.assert_called_once()
+        ops = self.mock_collection.bulk_write.call_args[0][0]
+        assert len(ops) == 2
+        assert all(isinstance(op, DeleteOne) for op in ops)
+
+    def test_delete_keys_empty(self):
+        num_deleted = self.store_repo.delete_keys("widgets", [])
+        assert num_deleted == 0
+        self.mock_collection.bulk_write.assert_not_called()
+
+    def test_update_ttls_empty(self):
+        num_updated = self.store_repo.update_ttls("widgets", [])
+        assert num_updated == 0
+        self.mock_collection.bulk_write.assert_not_called()
+
     def test_update_ttl(self):
-        self.mock_collection.update_one.return_value = Mock(modified_count=1)
+        self.mock_collection.bulk_write.return_value = Mock(modified_count=1)
         ttl_seconds = 60000
         expected_expiration = KeyDocument.get_expiration(ttl_seconds)
         self.store_repo.update_ttl("widgets", "widget_1", ttl_seconds)
-        self.mock_collection.update_one.assert_called_once()
-
-        actual_call = self.mock_collection.update_one.call_args
-        actual_expires_at = actual_call[0][1]["$set"]["expires_at"]
-        time_delta = expected_expiration - actual_expires_at
-        assert_delta_seconds_approx(time_delta, 0, epsilon=0.0001)
+        self.mock_collection.bulk_write.assert_called_once()
+        self.mock_collection.bulk_write.assert_called_with(
+            [
+                UpdateOne(
+                    {
+                        "store_name": "widgets",
+                        "key": "widget_1",
+                        "dataset_id": None,
+                    },
+                    {
+                        "$set": {
+                            "expires_at": IsApproxDateTime(
+                                expected_expiration
+                            ),
+                        }
+                    },
+                )
+            ],
+            ordered=False,
+        )
 
     def test_delete_store(self):
         self.mock_collection.delete_many.return_value = Mock(deleted_count=1)
@@ -150,9 +239,9 @@ class ExecutionStoreServiceIntegrationTests(unittest.TestCase):
         )
 
     def test_list_keys(self):
-        self.mock_collection.find.return_value = [
-            {"store_name": "widgets", "key": "widget_1"},
-            {"store_name": "widgets", "key": "widget_2"},
+        self.mock_collection.find.return_value.sort.return_value.limit.return_value = [
+            {"key": "widget_1"},
+            {"key": "widget_2"},
         ]
         keys = self.store_repo.list_keys("widgets")
         assert keys == ["widget_1", "widget_2"]
@@ -162,8 +251,9 @@ class ExecutionStoreServiceIntegrationTests(unittest.TestCase):
                 "store_name": "widgets",
                 "key": {"$ne": "__store__"},
                 "dataset_id": None,
+                **EXPIRY_FILTER,
             },
-            {"key": 1},
+            {"key": 1, "_id": 0},
         )
 
 
@@ -178,27 +268,32 @@ class TestExecutionStoreIntegration(unittest.TestCase):
         self.store.set(
             "widget_1", {"name": "Widget One", "value": 100}, ttl=60000
         )
-        self.mock_collection.update_one.assert_called_once()
-        self.mock_collection.update_one.assert_called_with(
-            {
-                "store_name": "mock_store",
-                "key": "widget_1",
-                "dataset_id": None,
-            },
-            {
-                "$set": {
-                    "updated_at": IsDateTime(),
-                    "value": {"name": "Widget One", "value": 100},
-                },
-                "$setOnInsert": {
-                    "store_name": "mock_store",
-                    "key": "widget_1",
-                    "created_at": IsDateTime(),
-                    "expires_at": IsDateTime(),
-                    "dataset_id": None,
-                },
-            },
-            upsert=True,
+        self.mock_collection.bulk_write.assert_called_once()
+        self.mock_collection.bulk_write.assert_called_with(
+            [
+                UpdateOne(
+                    {
+                        "store_name": "mock_store",
+                        "key": "widget_1",
+                        "dataset_id": None,
+                    },
+                    {
+                        "$set": {
+                            "value": {"name": "Widget One", "value": 100},
+                        },
+                        "$setOnInsert": {
+                            "store_name": "mock_store",
+                            "key": "widget_1",
+                            "created_at": IsDateTime(),
+                            "expires_at": IsDateTime(),
+                            "dataset_id": None,
+                        },
+                        "$currentDate": {"updated_at": True},
+                    },
+                    upsert=True,
+                )
+            ],
+            ordered=False,
         )
 
     def test_get(self):
@@ -216,21 +311,22 @@ class TestExecutionStoreIntegration(unittest.TestCase):
         self.mock_collection.find_one.assert_called_once()
 
     def test_list_keys(self):
-        self.mock_collection.find.return_value = [
-            {"store_name": "mock_store", "key": "widget_1"},
-            {"store_name": "mock_store", "key": "widget_2"},
+        self.mock_collection.find.return_value.sort.return_value.limit.return_value = [
+            {"key": "widget_1"},
+            {"key": "widget_2"},
         ]
         keys = self.store.list_keys()
         assert keys == ["widget_1", "widget_2"]
         self.mock_collection.find.assert_called_once()
 
     def test_delete(self):
-        self.mock_collection.delete_one.return_value = Mock(deleted_count=1)
+        self.mock_collection.bulk_write.return_value = Mock(deleted_count=1)
         deleted = self.store.delete("widget_1")
         assert deleted
-        self.mock_collection.delete_one.assert_called_once()
+        self.mock_collection.bulk_write.assert_called_once()
 
     def test_clear(self):
+        self.mock_collection.count_documents.return_value = 0
         self.store.clear()
         self.mock_collection.delete_many.assert_called_once()
 
@@ -251,27 +347,32 @@ class ExecutionStoreServiceDatasetIdTests(unittest.TestCase):
             {"name": "Widget One", "value": 100},
             ttl=60000,
         )
-        self.mock_collection.update_one.assert_called_once()
-        self.mock_collection.update_one.assert_called_with(
-            {
-                "store_name": "widgets",
-                "key": "widget_1",
-                "dataset_id": self.dataset_id,
-            },
-            {
-                "$set": {
-                    "value": {"name": "Widget One", "value": 100},
-                    "updated_at": IsDateTime(),
-                },
-                "$setOnInsert": {
-                    "store_name": "widgets",
-                    "key": "widget_1",
-                    "created_at": IsDateTime(),
-                    "expires_at": IsDateTime(),
-                    "dataset_id": self.dataset_id,
-                },
-            },
-            upsert=True,
+        self.mock_collection.bulk_write.assert_called_once()
+        self.mock_collection.bulk_write.assert_called_with(
+            [
+                UpdateOne(
+                    {
+                        "store_name": "widgets",
+                        "key": "widget_1",
+                        "dataset_id": self.dataset_id,
+                    },
+                    {
+                        "$set": {
+                            "value": {"name": "Widget One", "value": 100},
+                        },
+                        "$setOnInsert": {
+                            "store_name": "widgets",
+                            "key": "widget_1",
+                            "created_at": IsDateTime(),
+                            "expires_at": IsDateTime(),
+                            "dataset_id": self.dataset_id,
+                        },
+                        "$currentDate": {"updated_at": True},
+                    },
+                    upsert=True,
+                )
+            ],
+            ordered=False,
         )
 
     def test_get_key_with_dataset_id(self):
@@ -291,6 +392,7 @@ class ExecutionStoreServiceDatasetIdTests(unittest.TestCase):
                 "store_name": "widgets",
                 "key": "widget_1",
                 "dataset_id": self.dataset_id,
+                **EXPIRY_FILTER,
             }
         )
 
@@ -302,25 +404,31 @@ class ExecutionStoreServiceDatasetIdTests(unittest.TestCase):
                 "store_name": "widgets",
                 "key": {"$ne": "__store__"},
                 "dataset_id": self.dataset_id,
+                **EXPIRY_FILTER,
             },
-            {"key": 1},
+            {"key": 1, "_id": 0},
         )
 
     def test_delete_key_with_dataset_id(self):
         mock_result = MagicMock()
         mock_result.deleted_count = 1  # Simulate a successful deletion
-        self.mock_collection.delete_one.return_value = mock_result
+        self.mock_collection.bulk_write.return_value = mock_result
 
         deleted = self.store_service.delete_key("widgets", "widget_1")
         assert deleted
 
-        self.mock_collection.delete_one.assert_called_once()
-        self.mock_collection.delete_one.assert_called_with(
-            {
-                "store_name": "widgets",
-                "key": "widget_1",
-                "dataset_id": self.dataset_id,
-            }
+        self.mock_collection.bulk_write.assert_called_once()
+        self.mock_collection.bulk_write.assert_called_with(
+            [
+                DeleteOne(
+                    {
+                        "store_name": "widgets",
+                        "key": "widget_1",
+                        "dataset_id": self.dataset_id,
+                    }
+                )
+            ],
+            ordered=False,
         )
 
         def test_create_store_with_dataset_id(self):
@@ -350,26 +458,31 @@ class ExecutionStoreServiceDatasetIdTests(unittest.TestCase):
         expected_expiration = KeyDocument.get_expiration(ttl_seconds)
         mock_result = MagicMock()
         mock_result.modified_count = 1
-        self.mock_collection.update_one.return_value = mock_result
+        self.mock_collection.bulk_write.return_value = mock_result
 
         updated = self.store_service.update_ttl(
             "widgets", "widget_1", ttl_seconds
         )
         assert updated
 
-        actual_call = self.mock_collection.update_one.call_args
-        actual_query, actual_update = actual_call[0]
-
-        assert actual_query == {
-            "store_name": "widgets",
-            "key": "widget_1",
-            "dataset_id": self.dataset_id,
-        }
-
-        actual_expires_at = actual_update["$set"]["expires_at"]
-        assert isinstance(actual_expires_at, datetime)
-
-        time_delta = actual_expires_at - expected_expiration
-        assert_delta_seconds_approx(
-            time_delta, 0
-        )  # Check that the time difference is within the allowed EPSILON
+        self.mock_collection.bulk_write.assert_called_with(
+            [
+                UpdateOne(
+                    {
+                        "store_name": "widgets",
+                        "key": "widget_1",
+                        "dataset_id": self.dataset_id,
+                    },
+                    {
+                        "$set": {
+                            # Check that the expiration is within the
+                            # allowed EPSILON
+                            "expires_at": IsApproxDateTime(
+                                expected_expiration
+                            ),
+                        }
+                    },
+                )
+            ],
+            ordered=False,
+        )